@@ -2,12 +2,48 @@
 AI advisor for avocado plant growth optimization using Claude.
 """
 
+import hashlib
 import os
-from anthropic import Anthropic
+import struct
+import time
+from collections import OrderedDict, deque
+from typing import Optional
+import numpy as np
+from anthropic import Anthropic, Timeout
+from circuit_breaker import CircuitBreaker
 from sensors import SensorReading
 from display import OPTIMAL_RANGES
 
 
+MODEL = "claude-sonnet-4-20250514"
+
+# Fail fast instead of the SDK defaults (600 s read timeout, 2 retries) so a hung
+# call can't hold a worker thread long before the breaker sees a failure
+API_TIMEOUT = Timeout(10.0, connect=2.0)
+API_MAX_RETRIES = 1
+
+# Optimal bounds unpacked once for the per-tick fallback checks
+_T_LO, _T_HI = OPTIMAL_RANGES['temperature']
+_H_LO, _H_HI = OPTIMAL_RANGES['humidity']
+_C_LO, _C_HI = OPTIMAL_RANGES['co2']
+_L_LO, _L_HI = OPTIMAL_RANGES['light']
+
+OPTIMAL_TEXT = "All conditions optimal! Your avocado plant is in a great environment."
+
+# Response cache limits - identical conditions rarely need fresh advice within an hour
+CACHE_MAX_ENTRIES = 500
+CACHE_TTL_SECONDS = 3600.0
+
+# Near-match cache - max normalized distance between readings that share advice
+SEMANTIC_CACHE_MAX_ENTRIES = 200
+SEMANTIC_CACHE_THRESHOLD = 0.05
+
+# Per-axis scale so temperature, humidity, CO2 and light distances are comparable
+_FEATURE_SCALE = np.array([
+    sum(OPTIMAL_RANGES[name]) / 2 for name in ("temperature", "humidity", "co2", "light")
+])
+
+
 SYSTEM_PROMPT = """You are an expert botanist specializing in avocado plant cultivation.
 Your role is to analyze sensor readings from an avocado plant monitoring system and provide
 concise, actionable recommendations to optimize plant growth.
@@ -21,74 +57,201 @@ Optimal conditions for avocado plants:
 Keep your responses brief (2-3 sentences max) and focus on the most important adjustment needed.
 If all readings are optimal, provide a short encouraging status update."""
 
+PROMPT_TEMPLATE = """Current sensor readings for my avocado plant:
+- Temperature: {temp:.1f}°C
+- Humidity: {humidity:.1f}%
+- CO2: {co2:.0f} ppm
+- Light: {light:.0f} lux
+
+What adjustments should I make for optimal growth?"""
+
+
+def _quantize(reading: SensorReading) -> tuple:
+    """Round readings to the granularity at which advice is expected to change."""
+    _, temp, humidity, co2, light = reading
+    return (
+        round(temp, 1),
+        round(humidity),
+        round(co2 / 25) * 25,
+        round(light / 250) * 250,
+    )
+
+
+# Hash state for the model and system prompt, copied for each cache key
+_KEY_BASE = hashlib.sha256()
+_KEY_BASE.update(MODEL.encode() + b"\x00")
+_KEY_BASE.update(SYSTEM_PROMPT.encode())
+
+
+def _cache_key(reading: SensorReading) -> bytes:
+    """Build the response cache key for a reading."""
+    h = _KEY_BASE.copy()
+    h.update(struct.pack("<4d", *_quantize(reading)))
+    return h.digest()
+
+
+def _features(reading: SensorReading) -> np.ndarray:
+    """Build the normalized feature vector used for near-match lookups."""
+    return np.array(_quantize(reading), dtype=float) / _FEATURE_SCALE
+
+
+def _is_optimal(reading: SensorReading) -> bool:
+    """Return True if every metric is within its optimal range."""
+    _, temp, humidity, co2, light = reading
+    return (
+        _T_LO <= temp <= _T_HI
+        and _H_LO <= humidity <= _H_HI
+        and _C_LO <= co2 <= _C_HI
+        and _L_LO <= light <= _L_HI
+    )
+
 
 class AIAdvisor:
     """Claude-powered advisor for plant growth optimization."""
 
-    def __init__(self, api_key: str = None):
+    def __init__(
+        self,
+        api_key: str = None,
+        cache_max_entries: int = CACHE_MAX_ENTRIES,
+        cache_ttl: float = CACHE_TTL_SECONDS,
+        semantic_threshold: float = SEMANTIC_CACHE_THRESHOLD,
+        skip_on_optimal: bool = True,
+    ):
         self._api_key = api_key or os.getenv("ANTHROPIC_API_KEY")
         self._client = None
         if self._api_key:
-            self._client = Anthropic(api_key=self._api_key)
+            self._client = Anthropic(
+                api_key=self._api_key, timeout=API_TIMEOUT, max_retries=API_MAX_RETRIES
+            )
+
+        # Answer in-range readings locally; disable to always ask Claude
+        self._skip_on_optimal = skip_on_optimal
+        self._breaker = CircuitBreaker()
+
+        # LRU cache of successful API responses: key -> (text, inserted_at)
+        self._cache: OrderedDict[bytes, tuple[str, float]] = OrderedDict()
+        self._cache_max_entries = cache_max_entries
+        self._cache_ttl = cache_ttl
+        # FIFO of (feature vector, text, inserted_at) for near-duplicate readings
+        self._sem_cache: deque[tuple[np.ndarray, str, float]] = deque(
+            maxlen=SEMANTIC_CACHE_MAX_ENTRIES
+        )
+        self._semantic_threshold = semantic_threshold
+        self.stats = {"hits": 0, "misses": 0}
 
     def get_recommendation(self, reading: SensorReading) -> str:
         """Get AI recommendation based on current sensor readings."""
         if not self._client:
             return self._get_fallback_recommendation(reading)
 
+        if self._skip_on_optimal and _is_optimal(reading):
+            return OPTIMAL_TEXT
+
+        key = _cache_key(reading)
+        features = _features(reading)
+        cached = self._cache_get(key, features)
+        if cached is not None:
+            return cached
+
+        if self._breaker.is_open():
+            return self._get_fallback_recommendation(reading)
+
         prompt = self._build_prompt(reading)
 
         try:
             response = self._client.messages.create(
-                model="claude-sonnet-4-20250514",
+                model=MODEL,
                 max_tokens=150,
                 system=SYSTEM_PROMPT,
                 messages=[{"role": "user", "content": prompt}]
             )
-            return response.content[0].text
+            text = response.content[0].text
         except Exception as e:
+            self._breaker.record_failure()
             print(f"AI API error: {e}")
             return self._get_fallback_recommendation(reading)
 
+        self._breaker.record_success()
+        self._cache_put(key, features, text)
+        return text
+
+    def _cache_get(self, key: bytes, features: np.ndarray) -> Optional[str]:
+        """Return a cached recommendation for an exact or near match, or None."""
+        now = time.monotonic()
+        text = self._exact_lookup(key, now)
+        if text is None:
+            text = self._semantic_lookup(features, now)
+
+        self.stats["misses" if text is None else "hits"] += 1
+        return text
+
+    def _exact_lookup(self, key: bytes, now: float) -> Optional[str]:
+        """Look up the LRU cache, dropping the entry if it has expired."""
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        text, inserted_at = entry
+        if now - inserted_at >= self._cache_ttl:
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return text
+
+    def _semantic_lookup(self, features: np.ndarray, now: float) -> Optional[str]:
+        """Return the text of the closest cached reading within the threshold."""
+        # Entries are in insertion order, so expired ones are always at the front
+        while self._sem_cache and now - self._sem_cache[0][2] >= self._cache_ttl:
+            self._sem_cache.popleft()
+        if not self._sem_cache:
+            return None
+
+        vectors = np.stack([entry[0] for entry in self._sem_cache])
+        dists = np.linalg.norm(vectors - features, axis=1)
+        best = int(dists.argmin())
+        if dists[best] < self._semantic_threshold:
+            return self._sem_cache[best][1]
+        return None
+
+    def _cache_put(self, key: bytes, features: np.ndarray, text: str):
+        """Store a successful API response in both caches."""
+        now = time.monotonic()
+        self._cache[key] = (text, now)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self._cache_max_entries:
+            self._cache.popitem(last=False)
+        self._sem_cache.append((features, text, now))
+
     def _build_prompt(self, reading: SensorReading) -> str:
         """Build the prompt with current sensor readings."""
-        return f"""Current sensor readings for my avocado plant:
-- Temperature: {reading.temperature_c:.1f}°C
-- Humidity: {reading.humidity_percent:.1f}%
-- CO2: {reading.co2_ppm:.0f} ppm
-- Light: {reading.light_lux:.0f} lux
-
-What adjustments should I make for optimal growth?"""
+        _, temp, humidity, co2, light = reading
+        return PROMPT_TEMPLATE.format(temp=temp, humidity=humidity, co2=co2, light=light)
 
     def _get_fallback_recommendation(self, reading: SensorReading) -> str:
         """Generate basic recommendation without AI when API is unavailable."""
+        _, temp, humidity, co2, light = reading
         issues = []
 
-        temp_low, temp_high = OPTIMAL_RANGES['temperature']
-        if reading.temperature_c < temp_low:
+        if temp < _T_LO:
             issues.append("Temperature too low - consider warming the area")
-        elif reading.temperature_c > temp_high:
+        elif temp > _T_HI:
             issues.append("Temperature too high - improve ventilation")
 
-        hum_low, hum_high = OPTIMAL_RANGES['humidity']
-        if reading.humidity_percent < hum_low:
+        if humidity < _H_LO:
             issues.append("Humidity too low - mist leaves or use humidifier")
-        elif reading.humidity_percent > hum_high:
+        elif humidity > _H_HI:
             issues.append("Humidity too high - improve air circulation")
 
-        co2_low, co2_high = OPTIMAL_RANGES['co2']
-        if reading.co2_ppm < co2_low:
+        if co2 < _C_LO:
             issues.append("CO2 below normal - ensure adequate ventilation")
-        elif reading.co2_ppm > co2_high:
+        elif co2 > _C_HI:
             issues.append("CO2 elevated - increase fresh air exchange")
 
-        light_low, light_high = OPTIMAL_RANGES['light']
-        if reading.light_lux < light_low:
+        if light < _L_LO:
             issues.append("Light insufficient - move closer to window or add grow light")
-        elif reading.light_lux > light_high:
+        elif light > _L_HI:
             issues.append("Light too intense - add shade or move plant")
 
         if not issues:
-            return "All conditions optimal! Your avocado plant is in a great environment."
+            return OPTIMAL_TEXT
 
         return " | ".join(issues[:2])  # Return top 2 issues
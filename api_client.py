@@ -3,29 +3,110 @@ API client for pushing sensor readings and AI analysis to external service.
 """
 
 import os
+import queue
 import httpx
+import orjson
 from datetime import datetime
+from circuit_breaker import CircuitBreaker
 from sensors import SensorReading
 
 
+# Readings buffered between batch pushes; newest readings are dropped when full
+READING_QUEUE_SIZE = 1024
+READING_BATCH_SIZE = 64
+
+
+def _reading_dict(reading: SensorReading) -> dict:
+    """Return the sensor values of a reading as an API payload dict."""
+    _, temp, humidity, co2, light = reading
+    return {
+        "temperature_c": temp,
+        "humidity_percent": humidity,
+        "co2_ppm": co2,
+        "light_lux": light
+    }
+
+
+def serialize_reading(reading: SensorReading) -> bytes:
+    """Serialize a reading to the JSON body used by POST /readings."""
+    # orjson encodes datetimes natively in ISO 8601, same as isoformat()
+    return orjson.dumps({"timestamp": reading.timestamp, **_reading_dict(reading)})
+
+
 class APIClient:
     """Client for pushing updates to external API."""
 
-    def __init__(self, base_url: str = None, api_key: str = None):
+    def __init__(
+        self,
+        base_url: str = None,
+        api_key: str = None,
+        client: httpx.Client = None,
+        batch_endpoint: bool = False,
+    ):
         self._base_url = base_url or os.getenv("AIVOCADO_API_URL")
         self._api_key = api_key or os.getenv("AIVOCADO_API_KEY")
+        self._cached_headers = {
+            "Authorization": f"Bearer {self._api_key}",
+            "Content-Type": "application/json"
+        }
         self._enabled = bool(self._base_url and self._api_key)
+        self._queue: queue.Queue[bytes] = queue.Queue(maxsize=READING_QUEUE_SIZE)
+        # A batch that failed to send; it goes out first on the next flush
+        self._pending: list[bytes] = []
+        # POST /readings/batch is opt-in; otherwise flushes post each reading to /readings
+        self._batch_endpoint = batch_endpoint
+        self.dropped_readings = 0
+        self._breaker = CircuitBreaker()
 
-        if not self._enabled:
+        # One pooled connection reused across pushes (keep-alive, HTTP/2).
+        # A caller-supplied client (e.g. backed by httpx.MockTransport) keeps its
+        # transport and settings but still sends the auth and JSON headers.
+        self._http = None
+        if self._enabled:
+            if client is not None:
+                client.headers.update(self._headers())
+                self._http = client
+            else:
+                self._http = httpx.Client(
+                    base_url=self._base_url,
+                    headers=self._headers(),
+                    http2=True,
+                    timeout=httpx.Timeout(3.0, connect=2.0),
+                )
+        else:
             print("API client disabled: missing AIVOCADO_API_URL or AIVOCADO_API_KEY")
 
+    def close(self):
+        """Close the underlying HTTP connection pool."""
+        if self._http is not None:
+            self._http.close()
+
     def _headers(self) -> dict:
-        return {
-            "Authorization": f"Bearer {self._api_key}",
-            "Content-Type": "application/json"
-        }
+        # Built once in __init__; the key cannot change afterwards
+        return self._cached_headers
 
-    def push_reading(self, reading: SensorReading) -> bool:
+    def _post(self, path: str, body: bytes, action: str) -> bool:
+        """POST a JSON body, returning False on error or while the breaker is open."""
+        if self._breaker.is_open():
+            return False
+
+        try:
+            resp = self._http.post(path, content=body)
+        except Exception as e:
+            self._breaker.record_failure()
+            print(f"API error ({action}): {e}")
+            return False
+
+        # Error responses count towards the breaker just like network errors
+        if not resp.is_success:
+            self._breaker.record_failure()
+            print(f"API error ({action}): HTTP {resp.status_code}")
+            return False
+
+        self._breaker.record_success()
+        return True
+
+    def push_reading(self, reading: SensorReading, body: bytes = None) -> bool:
         """
         POST /readings
         Push sensor reading to external API.
@@ -38,31 +119,87 @@ class APIClient:
             "co2_ppm": 450,
             "light_lux": 5000
         }
+
+        Pass a body already built with serialize_reading to avoid encoding twice.
         """
         if not self._enabled:
             return False
 
-        payload = {
-            "timestamp": reading.timestamp.isoformat(),
-            "temperature_c": reading.temperature_c,
-            "humidity_percent": reading.humidity_percent,
-            "co2_ppm": reading.co2_ppm,
-            "light_lux": reading.light_lux
-        }
+        if body is None:
+            body = serialize_reading(reading)
+
+        return self._post("/readings", body, "push_reading")
+
+    def queue_reading(self, reading: SensorReading, body: bytes = None) -> bool:
+        """Queue a reading for the next batch push without blocking."""
+        if not self._enabled:
+            return False
+
+        if body is None:
+            body = serialize_reading(reading)
 
         try:
-            resp = httpx.post(
-                f"{self._base_url}/readings",
-                json=payload,
-                headers=self._headers(),
-                timeout=5.0
-            )
-            return resp.status_code == 200
-        except Exception as e:
-            print(f"API error (push_reading): {e}")
+            self._queue.put_nowait(body)
+        except queue.Full:
+            self.dropped_readings += 1
             return False
+        return True
+
+    def flush_readings(self) -> bool:
+        """
+        Push all queued sensor readings, up to READING_BATCH_SIZE at a time.
+
+        Readings are posted one by one to POST /readings, or with batch_endpoint
+        enabled, as a single POST /readings/batch per batch:
+        {
+            "readings": [
+                {
+                    "timestamp": "2026-01-14T10:30:00Z",
+                    "temperature_c": 22.5,
+                    "humidity_percent": 65.0,
+                    "co2_ppm": 450,
+                    "light_lux": 5000
+                },
+                ...
+            ]
+        }
 
-    def push_analysis(self, reading: SensorReading, recommendation: str) -> bool:
+        Readings that fail to send are kept and retried on the next flush.
+        """
+        if not self._enabled or self._breaker.is_open():
+            return False
+
+        while True:
+            batch, self._pending = self._pending, []
+            while len(batch) < READING_BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not batch:
+                return True
+
+            sent = self._send_batch(batch)
+            if sent < len(batch):
+                # Keep the unsent readings, and leave the rest queued, for the next flush
+                self._pending = batch[sent:]
+                return False
+
+    def _send_batch(self, batch: list[bytes]) -> int:
+        """Post a batch of serialized readings, returning how many were accepted."""
+        if self._batch_endpoint:
+            # Readings are queued pre-serialized, so splice them into the envelope
+            body = b'{"readings":[' + b",".join(batch) + b"]}"
+            return len(batch) if self._post("/readings/batch", body, "flush_readings") else 0
+
+        for sent, body in enumerate(batch):
+            if not self._post("/readings", body, "flush_readings"):
+                return sent
+        return len(batch)
+
+    def push_analysis(
+        self, reading: SensorReading, recommendation: str, timestamp: datetime = None
+    ) -> bool:
         """
         POST /analysis
         Push AI analysis to external API.
@@ -78,34 +215,27 @@ class APIClient:
             },
             "recommendation": "All conditions optimal. Your avocado is thriving."
         }
+
+        The timestamp defaults to the reading's own timestamp.
         """
         if not self._enabled:
             return False
 
         payload = {
-            "timestamp": datetime.now().isoformat(),
-            "reading": {
-                "temperature_c": reading.temperature_c,
-                "humidity_percent": reading.humidity_percent,
-                "co2_ppm": reading.co2_ppm,
-                "light_lux": reading.light_lux
-            },
+            "timestamp": timestamp or reading.timestamp,
+            "reading": _reading_dict(reading),
             "recommendation": recommendation
         }
 
-        try:
-            resp = httpx.post(
-                f"{self._base_url}/analysis",
-                json=payload,
-                headers=self._headers(),
-                timeout=5.0
-            )
-            return resp.status_code == 200
-        except Exception as e:
-            print(f"API error (push_analysis): {e}")
-            return False
+        return self._post("/analysis", orjson.dumps(payload), "push_analysis")
 
-    def push_alert(self, alert_type: str, message: str, reading: SensorReading = None) -> bool:
+    def push_alert(
+        self,
+        alert_type: str,
+        message: str,
+        reading: SensorReading = None,
+        timestamp: datetime = None,
+    ) -> bool:
         """
         POST /alerts
         Push alert when conditions are out of range.
@@ -117,32 +247,22 @@ class APIClient:
             "message": "Temperature is above optimal range",
             "reading": { ... }  // optional
         }
+
+        The timestamp defaults to the reading's timestamp, or the current time.
         """
         if not self._enabled:
             return False
 
+        if timestamp is None:
+            timestamp = reading.timestamp if reading else datetime.now()
+
         payload = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": timestamp,
             "type": alert_type,
             "message": message
         }
 
         if reading:
-            payload["reading"] = {
-                "temperature_c": reading.temperature_c,
-                "humidity_percent": reading.humidity_percent,
-                "co2_ppm": reading.co2_ppm,
-                "light_lux": reading.light_lux
-            }
+            payload["reading"] = _reading_dict(reading)
 
-        try:
-            resp = httpx.post(
-                f"{self._base_url}/alerts",
-                json=payload,
-                headers=self._headers(),
-                timeout=5.0
-            )
-            return resp.status_code == 200
-        except Exception as e:
-            print(f"API error (push_alert): {e}")
-            return False
+        return self._post("/alerts", orjson.dumps(payload), "push_alert")
@@ -0,0 +1,36 @@
+"""
+Circuit breaker shared by the network clients.
+"""
+
+import time
+
+
+# Stop calling a service for BREAKER_COOLDOWN seconds after this many consecutive errors
+BREAKER_THRESHOLD = 3
+BREAKER_COOLDOWN = 60.0
+
+
+class CircuitBreaker:
+    """Skips calls to a failing service until a cooldown has passed."""
+
+    def __init__(self, threshold: int = BREAKER_THRESHOLD, cooldown: float = BREAKER_COOLDOWN):
+        self._threshold = threshold
+        self._cooldown = cooldown
+        self._failures = 0
+        self._open_until = 0.0
+
+    def is_open(self) -> bool:
+        """Return True while calls should be skipped."""
+        return time.monotonic() < self._open_until
+
+    def record_success(self):
+        """Clear the consecutive failure count after a successful call."""
+        self._failures = 0
+
+    def record_failure(self):
+        """Count a failed call, opening the breaker once the threshold is reached."""
+        # Failures are not reset on opening, so one more error after the
+        # cooldown reopens the breaker immediately
+        self._failures += 1
+        if self._failures >= self._threshold:
+            self._open_until = time.monotonic() + self._cooldown
@@ -3,6 +3,8 @@ Terminal display for avocado plant monitoring dashboard.
 """
 
 import os
+import sys
+import textwrap
 from sensors import SensorReading
 
 
@@ -14,91 +16,132 @@ OPTIMAL_RANGES = {
     'light': (2000, 10000),       # Lux - bright indirect light (understory plant)
 }
 
+# Status labels indexed by (not value <= high) - (value < low) + 1; NaN counts as HIGH
+_STATUS_LABELS = ("[LOW]", "[OK]", "[HIGH]")
+_TEMP_LO, _TEMP_HI = OPTIMAL_RANGES['temperature']
+_HUM_LO, _HUM_HI = OPTIMAL_RANGES['humidity']
+_CO2_LO, _CO2_HI = OPTIMAL_RANGES['co2']
+_LIGHT_LO, _LIGHT_HI = OPTIMAL_RANGES['light']
+
+# Every possible bar at the default width, indexed by the number of filled cells
+_BAR_WIDTH = 30
+_BARS = tuple("[" + "#" * i + "-" * (_BAR_WIDTH - i) + "]" for i in range(_BAR_WIDTH + 1))
+
 
 def clear_screen():
     """Clear the terminal screen."""
-    os.system('cls' if os.name == 'nt' else 'clear')
+    if os.name == 'nt' and os.environ.get('ANSICON') is None:
+        os.system('cls')
+    else:
+        # VT100 home + clear, avoids spawning a shell every frame
+        sys.stdout.write("\x1b[H\x1b[2J")
+        sys.stdout.flush()
 
 
 def get_status_indicator(value: float, optimal_range: tuple[float, float]) -> str:
     """Return status indicator based on whether value is in optimal range."""
     low, high = optimal_range
-    if low <= value <= high:
-        return "[OK]"
-    elif value < low:
-        return "[LOW]"
-    else:
-        return "[HIGH]"
+    return _STATUS_LABELS[(not value <= high) - (value < low) + 1]
+
+
+def _status_indicators(reading: SensorReading) -> list[str]:
+    """Return status indicators for temperature, humidity, CO2 and light."""
+    _, temp, humidity, co2, light = reading
+    return [
+        _STATUS_LABELS[(not temp <= _TEMP_HI) - (temp < _TEMP_LO) + 1],
+        _STATUS_LABELS[(not humidity <= _HUM_HI) - (humidity < _HUM_LO) + 1],
+        _STATUS_LABELS[(not co2 <= _CO2_HI) - (co2 < _CO2_LO) + 1],
+        _STATUS_LABELS[(not light <= _LIGHT_HI) - (light < _LIGHT_LO) + 1],
+    ]
 
 
 def create_bar(value: float, min_val: float, max_val: float, width: int = 30) -> str:
     """Create a visual bar representation of a value."""
     normalized = (value - min_val) / (max_val - min_val)
-    normalized = max(0, min(1, normalized))
-    filled = int(normalized * width)
+    # Written so NaN lands in the empty bar instead of failing in int()
+    if not normalized > 0:
+        filled = 0
+    elif normalized >= 1:
+        filled = width
+    else:
+        filled = int(normalized * width)
+
+    if width == _BAR_WIDTH:
+        return _BARS[filled]
     return "[" + "#" * filled + "-" * (width - filled) + "]"
 
 
 def display_reading(reading: SensorReading, ai_recommendation: str = None):
     """Display sensor readings in a formatted dashboard."""
-    clear_screen()
+    temp_status, hum_status, co2_status, light_status = _status_indicators(reading)
 
-    print("=" * 60)
-    print("         AVOCADO PLANT MONITORING SYSTEM")
-    print("=" * 60)
-    print(f"  Last Update: {reading.timestamp.strftime('%Y-%m-%d %H:%M:%S')}")
-    print("=" * 60)
-    print()
+    lines = [
+        "=" * 60,
+        "         AVOCADO PLANT MONITORING SYSTEM",
+        "=" * 60,
+        f"  Last Update: {reading.timestamp.strftime('%Y-%m-%d %H:%M:%S')}",
+        "=" * 60,
+        "",
+    ]
 
     # Temperature
-    temp_status = get_status_indicator(reading.temperature_c, OPTIMAL_RANGES['temperature'])
     temp_bar = create_bar(reading.temperature_c, 10, 40)
-    print(f"  TEMPERATURE {temp_status}")
-    print(f"  {reading.temperature_c:6.1f} C   {temp_bar}")
-    print(f"  Optimal: {OPTIMAL_RANGES['temperature'][0]}-{OPTIMAL_RANGES['temperature'][1]} C")
-    print()
+    lines += [
+        f"  TEMPERATURE {temp_status}",
+        f"  {reading.temperature_c:6.1f} C   {temp_bar}",
+        f"  Optimal: {OPTIMAL_RANGES['temperature'][0]}-{OPTIMAL_RANGES['temperature'][1]} C",
+        "",
+    ]
 
     # Humidity
-    hum_status = get_status_indicator(reading.humidity_percent, OPTIMAL_RANGES['humidity'])
     hum_bar = create_bar(reading.humidity_percent, 0, 100)
-    print(f"  HUMIDITY {hum_status}")
-    print(f"  {reading.humidity_percent:6.1f} %   {hum_bar}")
-    print(f"  Optimal: {OPTIMAL_RANGES['humidity'][0]}-{OPTIMAL_RANGES['humidity'][1]} %")
-    print()
+    lines += [
+        f"  HUMIDITY {hum_status}",
+        f"  {reading.humidity_percent:6.1f} %   {hum_bar}",
+        f"  Optimal: {OPTIMAL_RANGES['humidity'][0]}-{OPTIMAL_RANGES['humidity'][1]} %",
+        "",
+    ]
 
     # CO2
-    co2_status = get_status_indicator(reading.co2_ppm, OPTIMAL_RANGES['co2'])
     co2_bar = create_bar(reading.co2_ppm, 300, 1500)
-    print(f"  CO2 LEVEL {co2_status}")
-    print(f"  {reading.co2_ppm:6.0f} ppm {co2_bar}")
-    print(f"  Optimal: {OPTIMAL_RANGES['co2'][0]}-{OPTIMAL_RANGES['co2'][1]} ppm")
-    print()
+    lines += [
+        f"  CO2 LEVEL {co2_status}",
+        f"  {reading.co2_ppm:6.0f} ppm {co2_bar}",
+        f"  Optimal: {OPTIMAL_RANGES['co2'][0]}-{OPTIMAL_RANGES['co2'][1]} ppm",
+        "",
+    ]
 
     # Light
-    light_status = get_status_indicator(reading.light_lux, OPTIMAL_RANGES['light'])
     light_bar = create_bar(reading.light_lux, 0, 20000)
-    print(f"  LIGHT LEVEL {light_status}")
-    print(f"  {reading.light_lux:6.0f} lux {light_bar}")
-    print(f"  Optimal: {OPTIMAL_RANGES['light'][0]}-{OPTIMAL_RANGES['light'][1]} lux")
-    print()
+    lines += [
+        f"  LIGHT LEVEL {light_status}",
+        f"  {reading.light_lux:6.0f} lux {light_bar}",
+        f"  Optimal: {OPTIMAL_RANGES['light'][0]}-{OPTIMAL_RANGES['light'][1]} lux",
+        "",
+    ]
 
-    print("=" * 60)
+    lines.append("=" * 60)
 
     if ai_recommendation:
-        print("  AI RECOMMENDATIONS")
-        print("-" * 60)
+        lines.append("  AI RECOMMENDATIONS")
+        lines.append("-" * 60)
         # Word wrap the recommendation
-        words = ai_recommendation.split()
-        line = "  "
-        for word in words:
-            if len(line) + len(word) + 1 > 58:
-                print(line)
-                line = "  " + word
-            else:
-                line += " " + word if line != "  " else word
-        if line.strip():
-            print(line)
-        print("=" * 60)
-
-    print()
-    print("  Press Ctrl+C to exit")
+        wrapped = textwrap.fill(
+            ai_recommendation,
+            width=58,
+            initial_indent="  ",
+            subsequent_indent="  ",
+            break_long_words=False,
+            break_on_hyphens=False,
+        )
+        if wrapped:
+            lines.append(wrapped)
+        lines.append("=" * 60)
+
+    lines.append("")
+    lines.append("  Press Ctrl+C to exit")
+
+    # Write the whole frame at once so it is drawn in a single syscall
+    clear_screen()
+    sys.stdout.write("\n".join(lines) + "\n")
+    sys.stdout.flush()
@@ -16,13 +16,19 @@ Environment:
 """
 
 import argparse
+import asyncio
+import os
 import time
 import sys
+from datetime import datetime
 
-from dotenv import load_dotenv
-load_dotenv()
+# Only look for a .env file when the environment doesn't already provide the config
+ENV_VARS = ("ANTHROPIC_API_KEY", "AIVOCADO_API_URL", "AIVOCADO_API_KEY")
+if not all(os.getenv(name) for name in ENV_VARS):
+    from dotenv import load_dotenv
+    load_dotenv()
 
-from sensors import get_sensor_interface
+from sensors import ReadingsHistory, get_sensor_interface
 from display import display_reading
 from ai_advisor import AIAdvisor
 from api_client import APIClient
@@ -50,9 +56,78 @@ def parse_args():
         default=60,
         help="Seconds between AI recommendations (default: 60)"
     )
+    parser.add_argument(
+        "--push-interval",
+        type=int,
+        default=60,
+        help="Seconds between pushes of queued readings to the external API (default: 60)"
+    )
+    parser.add_argument(
+        "--batch-push",
+        action="store_true",
+        help="Push queued readings in one request to POST /readings/batch"
+    )
     return parser.parse_args()
 
 
+async def update_recommendation(advisor: AIAdvisor, api: APIClient, reading) -> str:
+    """Fetch a new AI recommendation and push it to the external API."""
+    recommendation = await asyncio.to_thread(advisor.get_recommendation, reading)
+    await asyncio.to_thread(api.push_analysis, reading, recommendation)
+    return recommendation
+
+
+async def flush_readings(api: APIClient, interval: int):
+    """Periodically push queued readings to the external API."""
+    while True:
+        await asyncio.sleep(interval)
+        await asyncio.to_thread(api.flush_readings)
+
+
+async def monitor(args, sensors, advisor: AIAdvisor, api: APIClient):
+    """Read sensors on a fixed cadence while network calls run in the background."""
+    last_ai_update = 0.0
+    current_recommendation = "Initializing... gathering first readings."
+    rec_task = None
+    history = ReadingsHistory()
+    flusher = asyncio.create_task(flush_readings(api, args.push_interval))
+
+    try:
+        while True:
+            # Read sensors; the reading's timestamp is reused by every payload this tick
+            reading = sensors.read(datetime.now())
+            history.append(reading)
+
+            # Queue reading for the next push to the external API
+            api.queue_reading(reading)
+
+            # Pick up a finished recommendation; never wait on one still in flight
+            if rec_task is not None and rec_task.done():
+                error = rec_task.exception()
+                if error is None:
+                    current_recommendation = rec_task.result()
+                else:
+                    # Keep showing the previous advice; retried at the next AI interval
+                    print(f"Recommendation update failed: {error!r}")
+                rec_task = None
+
+            # Get AI recommendation if interval has passed and none is running
+            current_time = time.time()
+            if rec_task is None and current_time - last_ai_update >= args.ai_interval:
+                rec_task = asyncio.create_task(update_recommendation(advisor, api, reading))
+                last_ai_update = current_time
+
+            # Display dashboard
+            display_reading(reading, current_recommendation)
+
+            # Wait for next reading while the network calls run in the background
+            await asyncio.sleep(args.interval)
+    finally:
+        flusher.cancel()
+        if rec_task is not None:
+            rec_task.cancel()
+
+
 def main():
     """Main monitoring loop."""
     args = parse_args()
@@ -60,7 +135,7 @@ def main():
     # Initialize components
     sensors = get_sensor_interface(use_mock=not args.real)
     advisor = AIAdvisor()
-    api = APIClient()
+    api = APIClient(batch_endpoint=args.batch_push)
 
     print("Starting Avocado Plant Monitoring System...")
     print(f"Mode: {'Real sensors' if args.real else 'Mock sensors (testing)'}")
@@ -68,31 +143,11 @@ def main():
     print(f"AI recommendation interval: {args.ai_interval}s")
     print()
 
-    last_ai_update = 0
-    current_recommendation = "Initializing... gathering first readings."
-
     try:
-        while True:
-            # Read sensors
-            reading = sensors.read()
-
-            # Push reading to external API
-            api.push_reading(reading)
-
-            # Get AI recommendation if interval has passed
-            current_time = time.time()
-            if current_time - last_ai_update >= args.ai_interval:
-                current_recommendation = advisor.get_recommendation(reading)
-                api.push_analysis(reading, current_recommendation)
-                last_ai_update = current_time
-
-            # Display dashboard
-            display_reading(reading, current_recommendation)
-
-            # Wait for next reading
-            time.sleep(args.interval)
-
+        asyncio.run(monitor(args, sensors, advisor, api))
     except KeyboardInterrupt:
+        api.flush_readings()
+        api.close()
         print("\n\nMonitoring stopped. Goodbye!")
         sys.exit(0)
 
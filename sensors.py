@@ -3,14 +3,13 @@ Sensor interface for avocado plant monitoring.
 Supports both mock data (for testing) and real Raspberry Pi sensors.
 """
 
-import random
-from dataclasses import dataclass
 from datetime import datetime
-from typing import Protocol
+from typing import NamedTuple, Protocol
 
+import numpy as np
 
-@dataclass
-class SensorReading:
+
+class SensorReading(NamedTuple):
     """Container for all sensor readings at a point in time."""
     timestamp: datetime
     temperature_c: float  # Celsius
@@ -19,31 +18,70 @@ class SensorReading:
     light_lux: float  # Lux
 
 
+class ReadingsHistory:
+    """
+    Fixed-size ring buffer of recent readings for rolling analytics.
+    Values are stored column-wise (temperature, humidity, CO2, light) as float32.
+    """
+
+    def __init__(self, size: int = 1024):
+        self._buf = np.empty((size, 4), dtype=np.float32)
+        self._size = size
+        self._idx = 0  # Total readings appended; next slot is _idx % _size
+
+    def __len__(self) -> int:
+        return min(self._idx, self._size)
+
+    def append(self, reading: SensorReading):
+        """Store a reading, overwriting the oldest one once the buffer is full."""
+        _, temp, humidity, co2, light = reading
+        self._buf[self._idx % self._size] = (temp, humidity, co2, light)
+        self._idx += 1
+
+    def latest(self, k: int) -> np.ndarray:
+        """Return up to the last k readings as a (k, 4) array, oldest first."""
+        k = min(k, len(self))
+        end = self._idx % self._size
+        return self._buf[np.arange(end - k, end) % self._size]
+
+    def rolling_mean(self, k: int = 60) -> np.ndarray:
+        """Return the mean of each metric over the last k readings (NaN if empty)."""
+        if not len(self):
+            return np.full(4, np.nan, dtype=np.float32)
+        return self.latest(k).mean(axis=0)
+
+
 class SensorInterface(Protocol):
     """Protocol for sensor implementations."""
-    def read(self) -> SensorReading:
-        """Read current sensor values."""
+    def read(self, now: datetime = None) -> SensorReading:
+        """Read current sensor values, stamped with now (default: current time)."""
         ...
 
 
 class MockSensors:
     """Mock sensor implementation for testing without hardware."""
 
-    def __init__(self):
-        # Base values that drift slightly over time
-        self._base_temp = 22.0
-        self._base_humidity = 65.0
-        self._base_co2 = 450.0
-        self._base_light = 5000.0
-
-    def read(self) -> SensorReading:
+    def __init__(self, rng: np.random.Generator = None):
+        # Pass a seeded generator for reproducible readings
+        self._rng = rng if rng is not None else np.random.default_rng()
+        # Base values that drift slightly over time: temperature, humidity, CO2, light
+        self._bases = np.array([22.0, 65.0, 450.0, 5000.0])
+        self._spread = np.array([2.0, 5.0, 50.0, 1000.0])
+        # Physical limits each value is clamped to
+        self._floor = np.array([-np.inf, 0.0, 300.0, 0.0])
+        self._ceil = np.array([np.inf, 100.0, np.inf, np.inf])
+
+    def read(self, now: datetime = None) -> SensorReading:
         """Generate realistic mock sensor readings."""
+        noise = self._rng.uniform(-self._spread, self._spread)
+        values = np.clip(self._bases + noise, self._floor, self._ceil)
+        temp, humidity, co2, light = values.tolist()
         return SensorReading(
-            timestamp=datetime.now(),
-            temperature_c=self._base_temp + random.uniform(-2, 2),
-            humidity_percent=max(0, min(100, self._base_humidity + random.uniform(-5, 5))),
-            co2_ppm=max(300, self._base_co2 + random.uniform(-50, 50)),
-            light_lux=max(0, self._base_light + random.uniform(-1000, 1000)),
+            timestamp=now or datetime.now(),
+            temperature_c=temp,
+            humidity_percent=humidity,
+            co2_ppm=co2,
+            light_lux=light,
         )
 
 
@@ -102,11 +140,11 @@ class RaspberryPiSensors:
         except Exception:
             return 5000.0  # Default value
 
-    def read(self) -> SensorReading:
+    def read(self, now: datetime = None) -> SensorReading:
         """Read all sensors and return combined reading."""
         if not self._initialized:
             # Fall back to mock data if sensors not available
-            return MockSensors().read()
+            return MockSensors().read(now)
 
         try:
             temp = self._dht.temperature
@@ -116,7 +154,7 @@ class RaspberryPiSensors:
             humidity = 60.0
 
         return SensorReading(
-            timestamp=datetime.now(),
+            timestamp=now or datetime.now(),
             temperature_c=temp or 22.0,
             humidity_percent=humidity or 60.0,
             co2_ppm=self._read_co2(),
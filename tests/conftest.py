@@ -1,18 +1,20 @@
 """Shared test fixtures for AIVOCADO tests."""
 
+import copy
+import httpx
 import pytest
+import queue
 from datetime import datetime
+from typing import Iterator
 
-import sys
-from pathlib import Path
+import numpy as np
 
-# Add parent directory to path for imports
-sys.path.insert(0, str(Path(__file__).parent.parent))
+from api_client import APIClient, READING_QUEUE_SIZE
+from circuit_breaker import CircuitBreaker
+from sensors import MockSensors, SensorReading
 
-from sensors import SensorReading
 
-
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_reading() -> SensorReading:
     """Create a sample sensor reading with optimal values."""
     return SensorReading(
@@ -24,7 +26,7 @@ def sample_reading() -> SensorReading:
     )
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def low_temp_reading() -> SensorReading:
     """Create a reading with low temperature."""
     return SensorReading(
@@ -36,7 +38,7 @@ def low_temp_reading() -> SensorReading:
     )
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def high_temp_reading() -> SensorReading:
     """Create a reading with high temperature."""
     return SensorReading(
@@ -48,7 +50,7 @@ def high_temp_reading() -> SensorReading:
     )
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def all_out_of_range_reading() -> SensorReading:
     """Create a reading with all values out of optimal range."""
     return SensorReading(
@@ -58,3 +60,75 @@ def all_out_of_range_reading() -> SensorReading:
         co2_ppm=1200.0,  # Too high
         light_lux=500.0,  # Too low
     )
+
+
+@pytest.fixture(scope="session")
+def mock_sensors() -> MockSensors:
+    """Create one seeded mock sensor interface shared by all tests."""
+    return MockSensors(rng=np.random.default_rng(42))
+
+
+@pytest.fixture(scope="module")
+def readings_sample(mock_sensors) -> list[SensorReading]:
+    """Read 100 mock readings once per module for tests that check many samples."""
+    return [mock_sensors.read() for _ in range(100)]
+
+
+@pytest.fixture(scope="session")
+def captured() -> list[httpx.Request]:
+    """Collect the requests received by the mock transports, oldest first."""
+    return []
+
+
+@pytest.fixture(autouse=True)
+def _clear_captured(captured):
+    captured.clear()
+
+
+@pytest.fixture(scope="session")
+def transport(captured) -> httpx.MockTransport:
+    """Create one mock transport that answers every request with a 200 response."""
+    def handler(request: httpx.Request) -> httpx.Response:
+        captured.append(request)
+        return httpx.Response(200)
+
+    return httpx.MockTransport(handler)
+
+
+@pytest.fixture(scope="session")
+def _api_client_template(transport) -> Iterator[APIClient]:
+    """Create one enabled APIClient; building its HTTP client is the slow part."""
+    http = httpx.Client(transport=transport, base_url="http://example.com")
+    client = APIClient(base_url="http://example.com", api_key="key", client=http)
+    yield client
+    client.close()
+
+
+@pytest.fixture
+def api_client(_api_client_template) -> APIClient:
+    """Copy the template client, giving each test its own queue, pending batch and breaker."""
+    client = copy.copy(_api_client_template)
+    client._queue = queue.Queue(maxsize=READING_QUEUE_SIZE)
+    client._pending = []
+    client._breaker = CircuitBreaker()
+    return client
+
+
+@pytest.fixture
+def batch_api_client(api_client) -> APIClient:
+    """Copy the template client with POST /readings/batch enabled."""
+    api_client._batch_endpoint = True
+    return api_client
+
+
+@pytest.fixture
+def failing_api_client(captured) -> Iterator[APIClient]:
+    """Create an enabled APIClient whose every request fails to connect."""
+    def handler(request: httpx.Request) -> httpx.Response:
+        captured.append(request)
+        raise httpx.ConnectError("Network error")
+
+    http = httpx.Client(transport=httpx.MockTransport(handler), base_url="http://example.com")
+    client = APIClient(base_url="http://example.com", api_key="key", client=http)
+    yield client
+    client.close()
@@ -1,37 +1,67 @@
 """Tests for AI advisor module."""
 
 import pytest
+from types import SimpleNamespace
 from unittest.mock import Mock, patch, MagicMock
 
-import sys
-from pathlib import Path
+from circuit_breaker import BREAKER_THRESHOLD
+from ai_advisor import (
+    API_MAX_RETRIES,
+    API_TIMEOUT,
+    AIAdvisor,
+    OPTIMAL_TEXT,
+    SEMANTIC_CACHE_MAX_ENTRIES,
+    SYSTEM_PROMPT,
+    _cache_key,
+)
 
-sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from ai_advisor import AIAdvisor, SYSTEM_PROMPT
+def _response(text: str = "AI recommendation") -> SimpleNamespace:
+    """Build a stand-in for a Messages API response; only content[0].text is read."""
+    return SimpleNamespace(content=[SimpleNamespace(text=text)])
+
+
+@pytest.fixture
+def anthropic_client(monkeypatch) -> MagicMock:
+    """Make AIAdvisor use a mock client that answers "AI recommendation"."""
+    client = MagicMock()
+    client.messages.create.return_value = _response()
+    monkeypatch.setattr("ai_advisor.Anthropic", MagicMock(return_value=client))
+    return client
 
 
 class TestAIAdvisorInit:
     """Tests for AIAdvisor initialization."""
 
-    def test_init_without_api_key(self):
+    def test_init_without_api_key(self, monkeypatch):
         """Test initialization without API key."""
-        with patch.dict("os.environ", {}, clear=True):
-            advisor = AIAdvisor(api_key=None)
-            assert advisor._client is None
+        monkeypatch.delenv("ANTHROPIC_API_KEY", raising=False)
+        advisor = AIAdvisor(api_key=None)
+        assert advisor._client is None
 
     def test_init_with_api_key(self):
         """Test initialization with API key."""
         with patch("ai_advisor.Anthropic") as mock_anthropic:
             advisor = AIAdvisor(api_key="test-key")
-            mock_anthropic.assert_called_once_with(api_key="test-key")
+            assert mock_anthropic.call_args.kwargs["api_key"] == "test-key"
 
-    def test_init_from_env(self):
+    def test_init_from_env(self, monkeypatch):
         """Test initialization from environment variable."""
-        with patch.dict("os.environ", {"ANTHROPIC_API_KEY": "env-key"}):
-            with patch("ai_advisor.Anthropic") as mock_anthropic:
-                advisor = AIAdvisor()
-                mock_anthropic.assert_called_once_with(api_key="env-key")
+        monkeypatch.setenv("ANTHROPIC_API_KEY", "env-key")
+        with patch("ai_advisor.Anthropic") as mock_anthropic:
+            advisor = AIAdvisor()
+            assert mock_anthropic.call_args.kwargs["api_key"] == "env-key"
+
+
+    def test_init_limits_timeout_and_retries(self):
+        """Test the Claude client fails fast rather than using the SDK defaults."""
+        with patch("ai_advisor.Anthropic") as mock_anthropic:
+            AIAdvisor(api_key="test-key")
+            mock_anthropic.assert_called_once_with(
+                api_key="test-key", timeout=API_TIMEOUT, max_retries=API_MAX_RETRIES
+            )
+        assert API_TIMEOUT.read == 10.0
+        assert API_TIMEOUT.connect == 2.0
 
 
 class TestAIAdvisorBuildPrompt:
@@ -65,6 +95,15 @@ class TestAIAdvisorBuildPrompt:
         assert "5000" in prompt
         assert "Light" in prompt
 
+    def test_prompt_matches_direct_formatting(self, sample_reading):
+        """Test cached prompts match formatting the raw values."""
+        advisor = AIAdvisor(api_key=None)
+        reading = sample_reading._replace(temperature_c=22.25, co2_ppm=450.5)
+        prompt = advisor._build_prompt(reading)
+        assert f"Temperature: {22.25:.1f}°C" in prompt
+        assert f"CO2: {450.5:.0f} ppm" in prompt
+
+
 
 class TestAIAdvisorFallback:
     """Tests for fallback recommendations when API unavailable."""
@@ -101,6 +140,15 @@ class TestAIAdvisorFallback:
         # Count pipe separators (max 1 for 2 issues)
         assert result.count("|") <= 1
 
+    def test_fallback_reports_issues_in_priority_order(self, all_out_of_range_reading):
+        """Test fallback reports temperature and humidity before CO2 and light."""
+        advisor = AIAdvisor(api_key=None)
+        result = advisor._get_fallback_recommendation(all_out_of_range_reading)
+        assert result == (
+            "Temperature too high - improve ventilation | "
+            "Humidity too low - mist leaves or use humidifier"
+        )
+
 
 class TestAIAdvisorGetRecommendation:
     """Tests for getting recommendations."""
@@ -111,33 +159,155 @@ class TestAIAdvisorGetRecommendation:
         result = advisor.get_recommendation(sample_reading)
         assert "optimal" in result.lower()
 
-    def test_calls_api_when_available(self, sample_reading):
+    def test_calls_api_when_available(self, anthropic_client, sample_reading):
         """Test calls API when client available."""
-        with patch("ai_advisor.Anthropic") as mock_anthropic:
-            mock_client = MagicMock()
-            mock_response = MagicMock()
-            mock_response.content = [MagicMock(text="AI recommendation")]
-            mock_client.messages.create.return_value = mock_response
-            mock_anthropic.return_value = mock_client
-
-            advisor = AIAdvisor(api_key="test-key")
-            result = advisor.get_recommendation(sample_reading)
+        advisor = AIAdvisor(api_key="test-key", skip_on_optimal=False)
+        result = advisor.get_recommendation(sample_reading)
 
-            assert result == "AI recommendation"
-            mock_client.messages.create.assert_called_once()
+        assert result == "AI recommendation"
+        anthropic_client.messages.create.assert_called_once()
 
-    def test_falls_back_on_api_error(self, sample_reading):
+    def test_falls_back_on_api_error(self, anthropic_client, sample_reading):
         """Test falls back to rule-based on API error."""
-        with patch("ai_advisor.Anthropic") as mock_anthropic:
-            mock_client = MagicMock()
-            mock_client.messages.create.side_effect = Exception("API Error")
-            mock_anthropic.return_value = mock_client
+        anthropic_client.messages.create.side_effect = Exception("API Error")
 
-            advisor = AIAdvisor(api_key="test-key")
-            result = advisor.get_recommendation(sample_reading)
+        advisor = AIAdvisor(api_key="test-key", skip_on_optimal=False)
+        result = advisor.get_recommendation(sample_reading)
+
+        # Should return fallback, not raise exception
+        assert "optimal" in result.lower()
+
+    def test_stops_calling_api_after_repeated_errors(self, anthropic_client, high_temp_reading):
+        """Test the advisor falls back without calling a failing API."""
+        anthropic_client.messages.create.side_effect = Exception("API Error")
+
+        advisor = AIAdvisor(api_key="test-key")
+        for _ in range(BREAKER_THRESHOLD + 2):
+            result = advisor.get_recommendation(high_temp_reading)
+
+        assert "ventilation" in result
+        assert anthropic_client.messages.create.call_count == BREAKER_THRESHOLD
+
+    def test_optimal_reading_skips_api(self, anthropic_client, sample_reading):
+        """Test in-range readings are answered without calling the API."""
+        advisor = AIAdvisor(api_key="test-key")
+        result = advisor.get_recommendation(sample_reading)
+
+        assert result == OPTIMAL_TEXT
+        anthropic_client.messages.create.assert_not_called()
+
+    def test_out_of_range_reading_calls_api(self, anthropic_client, high_temp_reading):
+        """Test readings outside the optimal ranges still ask Claude."""
+        anthropic_client.messages.create.return_value = _response("Cool it")
+
+        advisor = AIAdvisor(api_key="test-key")
+        result = advisor.get_recommendation(high_temp_reading)
+
+        assert result == "Cool it"
+        anthropic_client.messages.create.assert_called_once()
+
+
+class TestAIAdvisorCache:
+    """Tests for the recommendation response cache."""
+
+    def test_repeated_reading_hits_cache(self, anthropic_client, sample_reading):
+        """Test identical readings only call the API once."""
+        advisor = AIAdvisor(api_key="test-key", skip_on_optimal=False)
+        first = advisor.get_recommendation(sample_reading)
+        second = advisor.get_recommendation(sample_reading)
+
+        assert first == second == "AI recommendation"
+        anthropic_client.messages.create.assert_called_once()
+        assert advisor.stats == {"hits": 1, "misses": 1}
+
+    def test_small_drift_hits_cache(self, anthropic_client, sample_reading):
+        """Test readings that quantize to the same values share a cache entry."""
+        advisor = AIAdvisor(api_key="test-key", skip_on_optimal=False)
+        advisor.get_recommendation(sample_reading)
+        drifted = sample_reading._replace(co2_ppm=sample_reading.co2_ppm + 5)
+        advisor.get_recommendation(drifted)
+
+        anthropic_client.messages.create.assert_called_once()
+
+    def test_different_reading_misses_cache(
+        self, anthropic_client, sample_reading, high_temp_reading
+    ):
+        """Test different conditions trigger a new API call."""
+        advisor = AIAdvisor(api_key="test-key", skip_on_optimal=False)
+        advisor.get_recommendation(sample_reading)
+        advisor.get_recommendation(high_temp_reading)
+
+        assert anthropic_client.messages.create.call_count == 2
+
+    def test_errors_are_not_cached(self, anthropic_client, sample_reading):
+        """Test fallback text from a failed call is never cached."""
+        ok_response = anthropic_client.messages.create.return_value
+        anthropic_client.messages.create.side_effect = [Exception("API Error"), ok_response]
+
+        advisor = AIAdvisor(api_key="test-key", skip_on_optimal=False)
+        advisor.get_recommendation(sample_reading)
+        result = advisor.get_recommendation(sample_reading)
 
-            # Should return fallback, not raise exception
-            assert "optimal" in result.lower()
+        assert result == "AI recommendation"
+        assert anthropic_client.messages.create.call_count == 2
+
+    def test_expired_entry_misses_cache(self, anthropic_client, sample_reading):
+        """Test entries older than the TTL are refreshed."""
+        advisor = AIAdvisor(api_key="test-key", cache_ttl=60, skip_on_optimal=False)
+        with patch("ai_advisor.time.monotonic", return_value=0.0) as mock_clock:
+            advisor.get_recommendation(sample_reading)
+            mock_clock.return_value = 61.0
+            advisor.get_recommendation(sample_reading)
+
+        assert anthropic_client.messages.create.call_count == 2
+
+    def test_cache_evicts_least_recently_used(
+        self, anthropic_client, sample_reading, high_temp_reading
+    ):
+        """Test cache stays within its entry limit."""
+        advisor = AIAdvisor(
+            api_key="test-key", cache_max_entries=1, semantic_threshold=0, skip_on_optimal=False
+        )
+        advisor.get_recommendation(sample_reading)
+        advisor.get_recommendation(high_temp_reading)
+        advisor.get_recommendation(sample_reading)
+
+        assert len(advisor._cache) == 1
+        assert anthropic_client.messages.create.call_count == 3
+
+    def test_cache_key_depends_on_quantized_reading(self, sample_reading, high_temp_reading):
+        """Test cache keys are stable per quantized reading and differ otherwise."""
+        drifted = sample_reading._replace(co2_ppm=sample_reading.co2_ppm + 5)
+        assert _cache_key(sample_reading) == _cache_key(drifted)
+        assert _cache_key(sample_reading) != _cache_key(high_temp_reading)
+
+    def test_near_match_hits_semantic_cache(self, anthropic_client, sample_reading):
+        """Test readings that drift slightly reuse the closest cached advice."""
+        advisor = AIAdvisor(api_key="test-key", skip_on_optimal=False)
+        advisor.get_recommendation(sample_reading)
+        drifted = sample_reading._replace(temperature_c=sample_reading.temperature_c + 0.4)
+        result = advisor.get_recommendation(drifted)
+
+        assert result == "AI recommendation"
+        anthropic_client.messages.create.assert_called_once()
+        assert advisor.stats == {"hits": 1, "misses": 1}
+
+    def test_distant_reading_misses_semantic_cache(self, anthropic_client, sample_reading):
+        """Test readings beyond the similarity threshold call the API."""
+        advisor = AIAdvisor(api_key="test-key", skip_on_optimal=False)
+        advisor.get_recommendation(sample_reading)
+        drifted = sample_reading._replace(temperature_c=sample_reading.temperature_c + 3)
+        advisor.get_recommendation(drifted)
+
+        assert anthropic_client.messages.create.call_count == 2
+
+    def test_semantic_cache_is_bounded(self, anthropic_client, sample_reading):
+        """Test the near-match cache drops its oldest entries when full."""
+        advisor = AIAdvisor(api_key="test-key", semantic_threshold=0, skip_on_optimal=False)
+        for i in range(SEMANTIC_CACHE_MAX_ENTRIES + 10):
+            advisor.get_recommendation(sample_reading._replace(light_lux=1000.0 * i))
+
+        assert len(advisor._sem_cache) == SEMANTIC_CACHE_MAX_ENTRIES
 
 
 class TestSystemPrompt:
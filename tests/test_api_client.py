@@ -1,55 +1,90 @@
 """Tests for API client module."""
 
+import httpx
+import orjson
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch
 from datetime import datetime
 
-import sys
-from pathlib import Path
-
-sys.path.insert(0, str(Path(__file__).parent.parent))
-
-from api_client import APIClient
+from api_client import (
+    APIClient,
+    READING_BATCH_SIZE,
+    serialize_reading,
+)
+from circuit_breaker import BREAKER_THRESHOLD
 from sensors import SensorReading
 
 
 class TestAPIClientInit:
-    """Tests for APIClient initialization."""
+    """
+    Tests for APIClient initialization.
 
-    def test_init_disabled_without_config(self):
+    AIVOCADO_API_URL and AIVOCADO_API_KEY are read once, in __init__; pushes
+    never look at the environment again.
+    """
+
+    def test_init_disabled_without_config(self, monkeypatch):
         """Test client is disabled without URL and key."""
-        with patch.dict("os.environ", {}, clear=True):
-            client = APIClient()
-            assert client._enabled is False
+        monkeypatch.delenv("AIVOCADO_API_URL", raising=False)
+        monkeypatch.delenv("AIVOCADO_API_KEY", raising=False)
+        client = APIClient()
+        assert client._enabled is False
 
-    def test_init_disabled_without_url(self):
+    def test_init_disabled_without_url(self, monkeypatch):
         """Test client is disabled without URL."""
-        with patch.dict("os.environ", {"AIVOCADO_API_KEY": "key"}, clear=True):
-            client = APIClient()
-            assert client._enabled is False
+        monkeypatch.delenv("AIVOCADO_API_URL", raising=False)
+        monkeypatch.setenv("AIVOCADO_API_KEY", "key")
+        client = APIClient()
+        assert client._enabled is False
 
-    def test_init_disabled_without_key(self):
+    def test_init_disabled_without_key(self, monkeypatch):
         """Test client is disabled without key."""
-        with patch.dict("os.environ", {"AIVOCADO_API_URL": "http://example.com"}, clear=True):
-            client = APIClient()
-            assert client._enabled is False
+        monkeypatch.setenv("AIVOCADO_API_URL", "http://example.com")
+        monkeypatch.delenv("AIVOCADO_API_KEY", raising=False)
+        client = APIClient()
+        assert client._enabled is False
 
     def test_init_enabled_with_both(self):
         """Test client is enabled with both URL and key."""
         client = APIClient(base_url="http://example.com", api_key="test-key")
         assert client._enabled is True
 
-    def test_init_from_env(self):
+    def test_init_from_env(self, monkeypatch):
         """Test initialization from environment."""
-        env = {
-            "AIVOCADO_API_URL": "http://example.com",
-            "AIVOCADO_API_KEY": "env-key",
-        }
-        with patch.dict("os.environ", env, clear=True):
-            client = APIClient()
-            assert client._enabled is True
-            assert client._base_url == "http://example.com"
-            assert client._api_key == "env-key"
+        monkeypatch.setenv("AIVOCADO_API_URL", "http://example.com")
+        monkeypatch.setenv("AIVOCADO_API_KEY", "env-key")
+        client = APIClient()
+        assert client._enabled is True
+        assert client._base_url == "http://example.com"
+        assert client._api_key == "env-key"
+
+    def test_env_read_once_per_instance(self, monkeypatch):
+        """Test later environment changes do not affect an existing client."""
+        monkeypatch.setenv("AIVOCADO_API_URL", "http://example.com")
+        monkeypatch.setenv("AIVOCADO_API_KEY", "env-key")
+        client = APIClient()
+        monkeypatch.setenv("AIVOCADO_API_KEY", "changed")
+        monkeypatch.delenv("AIVOCADO_API_URL")
+        assert client._api_key == "env-key"
+        assert client._base_url == "http://example.com"
+        assert client._headers()["Authorization"] == "Bearer env-key"
+        client.close()
+
+    def test_init_creates_persistent_http_client(self):
+        """Test enabled client holds one pooled HTTP client for all pushes."""
+        client = APIClient(base_url="http://example.com", api_key="test-key")
+        assert client._http is not None
+        assert client._http.headers["Authorization"] == "Bearer test-key"
+        client.close()
+        assert client._http.is_closed
+
+    def test_close_when_disabled(self, monkeypatch):
+        """Test closing a disabled client is a no-op."""
+        monkeypatch.delenv("AIVOCADO_API_URL", raising=False)
+        monkeypatch.delenv("AIVOCADO_API_KEY", raising=False)
+        client = APIClient()
+        assert client._http is None
+        client.close()
 
 
 class TestAPIClientHeaders:
@@ -61,128 +96,266 @@ class TestAPIClientHeaders:
         headers = client._headers()
         assert "Authorization" in headers
         assert headers["Authorization"] == "Bearer test-key"
+        assert client._headers() is headers
 
     def test_headers_include_content_type(self):
         """Test headers include content type."""
         client = APIClient(base_url="http://example.com", api_key="test-key")
         headers = client._headers()
         assert headers["Content-Type"] == "application/json"
+        assert client._headers() is headers
 
 
 class TestAPIClientPushReading:
     """Tests for pushing sensor readings."""
 
-    def test_push_reading_disabled_returns_false(self, sample_reading):
+    def test_push_reading_disabled_returns_false(self, monkeypatch, sample_reading):
         """Test push returns False when disabled."""
-        with patch.dict("os.environ", {}, clear=True):
-            client = APIClient()
-            result = client.push_reading(sample_reading)
-            assert result is False
+        monkeypatch.delenv("AIVOCADO_API_URL", raising=False)
+        monkeypatch.delenv("AIVOCADO_API_KEY", raising=False)
+        assert APIClient().push_reading(sample_reading) is False
 
-    def test_push_reading_success(self, sample_reading):
+    def test_push_reading_success(self, api_client, captured, sample_reading):
         """Test successful reading push."""
-        with patch("api_client.httpx.post") as mock_post:
-            mock_post.return_value = MagicMock(status_code=200)
+        result = api_client.push_reading(sample_reading)
 
-            client = APIClient(base_url="http://example.com", api_key="key")
-            result = client.push_reading(sample_reading)
+        assert result is True
+        assert len(captured) == 1
 
-            assert result is True
-            mock_post.assert_called_once()
+    def test_push_reading_sends_auth_headers(self, api_client, captured, sample_reading):
+        """Test pushes through an injected client carry the auth and JSON headers."""
+        api_client.push_reading(sample_reading)
 
-    def test_push_reading_correct_endpoint(self, sample_reading):
-        """Test reading pushed to correct endpoint."""
-        with patch("api_client.httpx.post") as mock_post:
-            mock_post.return_value = MagicMock(status_code=200)
+        assert captured[-1].headers["Authorization"] == "Bearer key"
+        assert captured[-1].headers["Content-Type"] == "application/json"
 
-            client = APIClient(base_url="http://example.com", api_key="key")
-            client.push_reading(sample_reading)
+    def test_push_reading_body(self, api_client, captured, sample_reading):
+        """Test reading is serialized with its timestamp and sensor values."""
+        api_client.push_reading(sample_reading)
 
-            call_args = mock_post.call_args
-            assert "/readings" in call_args[0][0]
+        assert orjson.loads(captured[-1].content) == {
+            "timestamp": "2026-01-15T12:00:00",
+            "temperature_c": 22.0,
+            "humidity_percent": 60.0,
+            "co2_ppm": 500.0,
+            "light_lux": 5000.0,
+        }
 
-    def test_push_reading_handles_error(self, sample_reading):
-        """Test push handles network error gracefully."""
-        with patch("api_client.httpx.post") as mock_post:
-            mock_post.side_effect = Exception("Network error")
+    def test_push_reading_uses_prebuilt_body(self, api_client, captured, sample_reading):
+        """Test a pre-serialized body is sent as-is."""
+        body = serialize_reading(sample_reading)
 
-            client = APIClient(base_url="http://example.com", api_key="key")
-            result = client.push_reading(sample_reading)
+        api_client.push_reading(sample_reading, body=body)
 
-            assert result is False
+        assert captured[-1].content == body
+
+    def test_push_reading_handles_error(self, failing_api_client, sample_reading):
+        """Test push handles network error gracefully."""
+        result = failing_api_client.push_reading(sample_reading)
+
+        assert result is False
 
 
 class TestAPIClientPushAnalysis:
     """Tests for pushing AI analysis."""
 
-    def test_push_analysis_disabled_returns_false(self, sample_reading):
+    def test_push_analysis_disabled_returns_false(self, monkeypatch, sample_reading):
         """Test push returns False when disabled."""
-        with patch.dict("os.environ", {}, clear=True):
-            client = APIClient()
-            result = client.push_analysis(sample_reading, "test recommendation")
-            assert result is False
+        monkeypatch.delenv("AIVOCADO_API_URL", raising=False)
+        monkeypatch.delenv("AIVOCADO_API_KEY", raising=False)
+        assert APIClient().push_analysis(sample_reading, "test recommendation") is False
 
-    def test_push_analysis_success(self, sample_reading):
+    def test_push_analysis_success(self, api_client, sample_reading):
         """Test successful analysis push."""
-        with patch("api_client.httpx.post") as mock_post:
-            mock_post.return_value = MagicMock(status_code=200)
+        result = api_client.push_analysis(sample_reading, "test recommendation")
 
-            client = APIClient(base_url="http://example.com", api_key="key")
-            result = client.push_analysis(sample_reading, "test recommendation")
+        assert result is True
 
-            assert result is True
+    def test_push_analysis_uses_reading_timestamp(self, api_client, captured, sample_reading):
+        """Test analysis is stamped with the reading time unless overridden."""
+        api_client.push_analysis(sample_reading, "recommendation")
+        default = orjson.loads(captured[-1].content)
+        api_client.push_analysis(
+            sample_reading, "recommendation", timestamp=datetime(2026, 1, 15, 12, 0, 5)
+        )
+        explicit = orjson.loads(captured[-1].content)
 
-    def test_push_analysis_correct_endpoint(self, sample_reading):
-        """Test analysis pushed to correct endpoint."""
-        with patch("api_client.httpx.post") as mock_post:
-            mock_post.return_value = MagicMock(status_code=200)
-
-            client = APIClient(base_url="http://example.com", api_key="key")
-            client.push_analysis(sample_reading, "recommendation")
-
-            call_args = mock_post.call_args
-            assert "/analysis" in call_args[0][0]
+        assert default["timestamp"] == "2026-01-15T12:00:00"
+        assert explicit["timestamp"] == "2026-01-15T12:00:05"
 
 
 class TestAPIClientPushAlert:
     """Tests for pushing alerts."""
 
-    def test_push_alert_disabled_returns_false(self):
+    def test_push_alert_disabled_returns_false(self, monkeypatch):
         """Test push returns False when disabled."""
-        with patch.dict("os.environ", {}, clear=True):
-            client = APIClient()
-            result = client.push_alert("temp_high", "Temperature alert")
-            assert result is False
+        monkeypatch.delenv("AIVOCADO_API_URL", raising=False)
+        monkeypatch.delenv("AIVOCADO_API_KEY", raising=False)
+        assert APIClient().push_alert("temp_high", "Temperature alert") is False
 
-    def test_push_alert_success(self):
+    def test_push_alert_success(self, api_client):
         """Test successful alert push."""
-        with patch("api_client.httpx.post") as mock_post:
-            mock_post.return_value = MagicMock(status_code=200)
-
-            client = APIClient(base_url="http://example.com", api_key="key")
-            result = client.push_alert("temp_high", "Temperature is high")
+        result = api_client.push_alert("temp_high", "Temperature is high")
 
-            assert result is True
+        assert result is True
 
-    def test_push_alert_with_reading(self, sample_reading):
+    def test_push_alert_with_reading(self, api_client, captured, sample_reading):
         """Test alert push with reading included."""
-        with patch("api_client.httpx.post") as mock_post:
-            mock_post.return_value = MagicMock(status_code=200)
+        result = api_client.push_alert("temp_high", "Alert", reading=sample_reading)
 
-            client = APIClient(base_url="http://example.com", api_key="key")
-            result = client.push_alert("temp_high", "Alert", reading=sample_reading)
+        assert result is True
+        assert "reading" in orjson.loads(captured[-1].content)
 
-            assert result is True
-            call_kwargs = mock_post.call_args[1]
-            assert "reading" in call_kwargs["json"]
+    def test_push_alert_timestamp_encoded(self, api_client, captured):
+        """Test datetimes are encoded as ISO 8601 strings."""
+        api_client.push_alert("temp_high", "Alert", timestamp=datetime(2026, 1, 15, 12, 0, 0, 500))
 
-    def test_push_alert_correct_endpoint(self):
-        """Test alert pushed to correct endpoint."""
-        with patch("api_client.httpx.post") as mock_post:
-            mock_post.return_value = MagicMock(status_code=200)
+        body = orjson.loads(captured[-1].content)
+        assert body["timestamp"] == datetime(2026, 1, 15, 12, 0, 0, 500).isoformat()
 
-            client = APIClient(base_url="http://example.com", api_key="key")
-            client.push_alert("test_type", "test message")
 
-            call_args = mock_post.call_args
-            assert "/alerts" in call_args[0][0]
+class TestAPIClientEndpoints:
+    """Tests for the path each push is sent to."""
+
+    @pytest.mark.parametrize(
+        "method,make_args,path",
+        [
+            ("push_reading", lambda reading: (reading,), "/readings"),
+            ("push_analysis", lambda reading: (reading, "recommendation"), "/analysis"),
+            ("push_alert", lambda reading: ("temp_high", "Alert"), "/alerts"),
+        ],
+    )
+    def test_push_correct_endpoint(
+        self, api_client, captured, sample_reading, method, make_args, path
+    ):
+        """Test each push is sent to its endpoint."""
+        getattr(api_client, method)(*make_args(sample_reading))
+
+        assert captured[-1].url.path == path
+
+
+class TestAPIClientBatchReadings:
+    """Tests for queued, batched reading pushes."""
+
+    def test_queue_reading_disabled_returns_false(self, monkeypatch, sample_reading):
+        """Test queueing returns False when disabled."""
+        monkeypatch.delenv("AIVOCADO_API_URL", raising=False)
+        monkeypatch.delenv("AIVOCADO_API_KEY", raising=False)
+        assert APIClient().queue_reading(sample_reading) is False
+
+    def test_queue_reading_does_not_post(self, api_client, captured, sample_reading):
+        """Test queueing a reading makes no network call."""
+        assert api_client.queue_reading(sample_reading) is True
+        assert not captured
+
+    def test_queue_reading_drops_when_full(self, sample_reading):
+        """Test readings are dropped and counted once the queue is full."""
+        with patch("api_client.READING_QUEUE_SIZE", 2):
+            client = APIClient(base_url="http://example.com", api_key="key")
+        for _ in range(3):
+            client.queue_reading(sample_reading)
+        assert client.dropped_readings == 1
+
+    def test_flush_posts_each_reading_by_default(self, api_client, captured, sample_reading):
+        """Test queued readings are posted one by one unless batching is enabled."""
+        for _ in range(3):
+            api_client.queue_reading(sample_reading)
+
+        assert api_client.flush_readings() is True
+        assert [request.url.path for request in captured] == ["/readings"] * 3
+        assert captured[-1].content == serialize_reading(sample_reading)
+
+    def test_flush_posts_single_batch(self, batch_api_client, captured, sample_reading):
+        """Test queued readings are pushed together to the batch endpoint."""
+        for _ in range(3):
+            batch_api_client.queue_reading(sample_reading)
+
+        assert batch_api_client.flush_readings() is True
+        assert len(captured) == 1
+        assert captured[-1].url.path == "/readings/batch"
+        body = orjson.loads(captured[-1].content)
+        assert body["readings"] == [orjson.loads(serialize_reading(sample_reading))] * 3
+
+    def test_flush_splits_large_batches(self, batch_api_client, captured, sample_reading):
+        """Test flushing respects the maximum batch size."""
+        for _ in range(READING_BATCH_SIZE + 1):
+            batch_api_client.queue_reading(sample_reading)
+
+        batch_api_client.flush_readings()
+        assert len(captured) == 2
+
+    def test_flush_empty_queue_does_not_post(self, api_client, captured):
+        """Test flushing with nothing queued makes no network call."""
+        assert api_client.flush_readings() is True
+        assert not captured
+
+    def test_flush_handles_error(self, failing_api_client, sample_reading):
+        """Test flush handles network error gracefully."""
+        failing_api_client.queue_reading(sample_reading)
+
+        assert failing_api_client.flush_readings() is False
+
+    @pytest.mark.parametrize("batch_endpoint", [False, True])
+    @pytest.mark.parametrize(
+        "failure",
+        [httpx.ConnectError("Network error"), httpx.Response(404)],
+        ids=["connect_error", "http_404"],
+    )
+    def test_readings_survive_failed_flush(self, sample_reading, batch_endpoint, failure):
+        """Test readings from a failed flush are sent by the next one."""
+        failing = True
+        sent = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            if failing:
+                if isinstance(failure, Exception):
+                    raise failure
+                return failure
+            body = orjson.loads(request.content)
+            sent.extend(body["readings"] if request.url.path == "/readings/batch" else [body])
+            return httpx.Response(200)
+
+        http = httpx.Client(transport=httpx.MockTransport(handler), base_url="http://example.com")
+        client = APIClient(
+            base_url="http://example.com", api_key="key", client=http, batch_endpoint=batch_endpoint
+        )
+        for _ in range(5):
+            client.queue_reading(sample_reading)
+
+        assert client.flush_readings() is False
+        failing = False
+        assert client.flush_readings() is True
+        assert sent == [orjson.loads(serialize_reading(sample_reading))] * 5
+        client.close()
+
+
+class TestAPIClientCircuitBreaker:
+    """Tests for skipping calls to a failing API."""
+
+    def test_push_skipped_while_open(self, failing_api_client, captured, sample_reading):
+        """Test pushes stop hitting the network after repeated errors."""
+        for _ in range(BREAKER_THRESHOLD + 2):
+            assert failing_api_client.push_reading(sample_reading) is False
+
+        assert len(captured) == BREAKER_THRESHOLD
+
+    def test_error_response_counts_as_failure(self, sample_reading):
+        """Test non-2xx responses fail the push and count towards the breaker."""
+        http = httpx.Client(
+            transport=httpx.MockTransport(lambda request: httpx.Response(500)),
+            base_url="http://example.com",
+        )
+        client = APIClient(base_url="http://example.com", api_key="key", client=http)
+
+        for _ in range(BREAKER_THRESHOLD):
+            assert client.push_reading(sample_reading) is False
+
+        assert client._breaker.is_open()
+        client.close()
+
+    def test_flush_keeps_queue_while_open(self, api_client, sample_reading):
+        """Test queued readings are kept while the breaker is open."""
+        api_client.queue_reading(sample_reading)
+        with patch.object(api_client._breaker, "is_open", return_value=True):
+            assert api_client.flush_readings() is False
+        assert api_client._queue.qsize() == 1
@@ -0,0 +1,34 @@
+"""Tests for circuit breaker module."""
+
+from unittest.mock import patch
+
+from circuit_breaker import CircuitBreaker
+
+
+class TestCircuitBreaker:
+    """Tests for skipping calls to a failing service."""
+
+    def test_breaker_opens_after_threshold(self):
+        """Test the breaker opens once consecutive failures reach the threshold."""
+        breaker = CircuitBreaker(threshold=3, cooldown=60)
+        for _ in range(2):
+            breaker.record_failure()
+        assert not breaker.is_open()
+        breaker.record_failure()
+        assert breaker.is_open()
+
+    def test_success_resets_failures(self):
+        """Test a success clears the failure count."""
+        breaker = CircuitBreaker(threshold=2, cooldown=60)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        assert not breaker.is_open()
+
+    def test_breaker_closes_after_cooldown(self):
+        """Test calls are allowed again after the cooldown."""
+        breaker = CircuitBreaker(threshold=1, cooldown=60)
+        with patch("circuit_breaker.time.monotonic", return_value=0.0):
+            breaker.record_failure()
+        with patch("circuit_breaker.time.monotonic", return_value=61.0):
+            assert not breaker.is_open()
@@ -1,115 +1,109 @@
 """Tests for display module."""
 
 import pytest
+from unittest.mock import patch
 
-import sys
-from pathlib import Path
-
-sys.path.insert(0, str(Path(__file__).parent.parent))
-
-from display import get_status_indicator, create_bar, OPTIMAL_RANGES
+from display import (
+    OPTIMAL_RANGES,
+    _status_indicators,
+    clear_screen,
+    create_bar,
+    display_reading,
+    get_status_indicator,
+)
 
 
 class TestGetStatusIndicator:
     """Tests for status indicator function."""
 
-    def test_value_in_range_returns_ok(self):
-        """Test that value within range returns OK."""
-        result = get_status_indicator(22.0, (18, 26))
-        assert result == "[OK]"
-
-    def test_value_at_low_boundary_returns_ok(self):
-        """Test that value at lower boundary is OK."""
-        result = get_status_indicator(18.0, (18, 26))
-        assert result == "[OK]"
-
-    def test_value_at_high_boundary_returns_ok(self):
-        """Test that value at upper boundary is OK."""
-        result = get_status_indicator(26.0, (18, 26))
-        assert result == "[OK]"
-
-    def test_value_below_range_returns_low(self):
-        """Test that value below range returns LOW."""
-        result = get_status_indicator(10.0, (18, 26))
-        assert result == "[LOW]"
-
-    def test_value_above_range_returns_high(self):
-        """Test that value above range returns HIGH."""
-        result = get_status_indicator(30.0, (18, 26))
-        assert result == "[HIGH]"
+    @pytest.mark.parametrize(
+        "value,bounds,expected",
+        [
+            (22.0, (18, 26), "[OK]"),
+            (18.0, (18, 26), "[OK]"),  # Low boundary is inclusive
+            (26.0, (18, 26), "[OK]"),  # High boundary is inclusive
+            (10.0, (18, 26), "[LOW]"),
+            (30.0, (18, 26), "[HIGH]"),
+            (float("nan"), (18, 26), "[HIGH]"),  # Not in range, so flagged like before
+        ],
+    )
+    def test_status(self, value, bounds, expected):
+        """Test values are classified against the range, boundaries included."""
+        assert get_status_indicator(value, bounds) == expected
 
     def test_temperature_optimal_ranges(self):
         """Test status for temperature optimal ranges."""
-        low, high = OPTIMAL_RANGES["temperature"]
-        assert get_status_indicator(low, (low, high)) == "[OK]"
-        assert get_status_indicator(high, (low, high)) == "[OK]"
-        assert get_status_indicator(low - 1, (low, high)) == "[LOW]"
-        assert get_status_indicator(high + 1, (low, high)) == "[HIGH]"
+        rng = OPTIMAL_RANGES["temperature"]
+        low, high = rng
+        assert get_status_indicator(low, rng) == "[OK]"
+        assert get_status_indicator(high, rng) == "[OK]"
+        assert get_status_indicator(low - 1, rng) == "[LOW]"
+        assert get_status_indicator(high + 1, rng) == "[HIGH]"
+
+    def test_status_indicators_for_reading(self, all_out_of_range_reading):
+        """Test all four metrics are classified in one pass."""
+        assert _status_indicators(all_out_of_range_reading) == [
+            "[HIGH]", "[LOW]", "[HIGH]", "[LOW]"
+        ]
+
+    def test_status_indicators_match_single_metric(self, sample_reading):
+        """Test the unrolled per-reading checks agree with get_status_indicator."""
+        nan = float("nan")
+        for values in [(10.0, 80.0, 300.0, 20000.0), (nan, nan, nan, nan)]:
+            reading = sample_reading._replace(
+                temperature_c=values[0], humidity_percent=values[1],
+                co2_ppm=values[2], light_lux=values[3],
+            )
+            expected = [
+                get_status_indicator(value, OPTIMAL_RANGES[name])
+                for value, name in zip(values, ("temperature", "humidity", "co2", "light"))
+            ]
+            assert _status_indicators(reading) == expected
+
+    def test_status_indicators_optimal_reading(self, sample_reading):
+        """Test an optimal reading is OK on every metric."""
+        assert _status_indicators(sample_reading) == ["[OK]"] * 4
 
 
 class TestCreateBar:
     """Tests for visual bar creation function."""
 
-    def test_bar_minimum_value(self):
-        """Test bar at minimum value."""
-        bar = create_bar(0, 0, 100, width=10)
-        assert bar == "[----------]"
-
-    def test_bar_maximum_value(self):
-        """Test bar at maximum value."""
-        bar = create_bar(100, 0, 100, width=10)
-        assert bar == "[##########]"
-
-    def test_bar_middle_value(self):
-        """Test bar at 50% value."""
-        bar = create_bar(50, 0, 100, width=10)
-        assert bar == "[#####-----]"
-
-    def test_bar_below_minimum_clamped(self):
-        """Test that values below minimum are clamped."""
-        bar = create_bar(-50, 0, 100, width=10)
-        assert bar == "[----------]"
-
-    def test_bar_above_maximum_clamped(self):
-        """Test that values above maximum are clamped."""
-        bar = create_bar(200, 0, 100, width=10)
-        assert bar == "[##########]"
-
-    def test_bar_custom_width(self):
-        """Test bar with custom width."""
-        bar = create_bar(50, 0, 100, width=20)
-        assert len(bar) == 22  # 20 + 2 brackets
-        assert bar.count("#") == 10
-        assert bar.count("-") == 10
+    @pytest.mark.parametrize(
+        "value,low,high,width,expected",
+        [
+            (0, 0, 100, 10, "[----------]"),
+            (100, 0, 100, 10, "[##########]"),
+            (50, 0, 100, 10, "[#####-----]"),
+            (-50, 0, 100, 10, "[----------]"),  # Clamped to minimum
+            (200, 0, 100, 10, "[##########]"),  # Clamped to maximum
+            (50, 0, 100, 20, "[" + "#" * 10 + "-" * 10 + "]"),
+            (float("nan"), 0, 100, 10, "[----------]"),  # Unknown value draws empty
+        ],
+    )
+    def test_bar(self, value, low, high, width, expected):
+        """Test bar fill for in-range, boundary, clamped, custom-width and NaN values."""
+        assert create_bar(value, low, high, width=width) == expected
 
     def test_bar_default_width(self):
         """Test bar with default width of 30."""
         bar = create_bar(50, 0, 100)
         assert len(bar) == 32  # 30 + 2 brackets
 
+    def test_bar_default_width_matches_custom_path(self):
+        """Test precomputed default-width bars match the general construction."""
+        for value in (-10, 0, 1, 33.3, 50, 99.9, 100, 150):
+            filled = int(max(0, min(1, value / 100)) * 30)
+            assert create_bar(value, 0, 100) == "[" + "#" * filled + "-" * (30 - filled) + "]"
+
 
 class TestOptimalRanges:
     """Tests for optimal range constants."""
 
-    def test_temperature_range_exists(self):
-        """Test temperature range is defined."""
-        assert "temperature" in OPTIMAL_RANGES
-        assert len(OPTIMAL_RANGES["temperature"]) == 2
-
-    def test_humidity_range_exists(self):
-        """Test humidity range is defined."""
-        assert "humidity" in OPTIMAL_RANGES
-        assert len(OPTIMAL_RANGES["humidity"]) == 2
-
-    def test_co2_range_exists(self):
-        """Test CO2 range is defined."""
-        assert "co2" in OPTIMAL_RANGES
-        assert len(OPTIMAL_RANGES["co2"]) == 2
-
-    def test_light_range_exists(self):
-        """Test light range is defined."""
-        assert "light" in OPTIMAL_RANGES
-        assert len(OPTIMAL_RANGES["light"]) == 2
+    @pytest.mark.parametrize("key", ["temperature", "humidity", "co2", "light"])
+    def test_range_exists(self, key):
+        """Test each metric has a (low, high) range defined."""
+        assert key in OPTIMAL_RANGES
+        assert len(OPTIMAL_RANGES[key]) == 2
 
     def test_temperature_range_reasonable(self):
         """Test temperature range is reasonable for avocados."""
@@ -121,3 +115,48 @@ class TestOptimalRanges:
         """Test all ranges have low < high."""
         for name, (low, high) in OPTIMAL_RANGES.items():
             assert low < high, f"{name} range is invalid: {low} >= {high}"
+
+
+class TestDisplayReading:
+    """Tests for the dashboard rendering."""
+
+    def test_recommendation_is_wrapped(self, sample_reading, capsys):
+        """Test long recommendations wrap to indented lines within the frame."""
+        recommendation = " ".join(["Increase humidity around the plant"] * 6)
+        with patch("display.clear_screen"):
+            display_reading(sample_reading, recommendation)
+
+        out = capsys.readouterr().out
+        section = out.split("AI RECOMMENDATIONS")[1].split("=" * 60)[0]
+        lines = [line for line in section.splitlines()[2:] if line]
+        assert len(lines) > 1
+        assert all(line.startswith("  ") and len(line) <= 58 for line in lines)
+        assert " ".join(line.strip() for line in lines) == recommendation
+
+    def test_no_recommendation_section_without_text(self, sample_reading, capsys):
+        """Test the recommendation section is omitted when there is no text."""
+        with patch("display.clear_screen"):
+            display_reading(sample_reading)
+
+        assert "AI RECOMMENDATIONS" not in capsys.readouterr().out
+
+    def test_frame_is_written_once(self, sample_reading):
+        """Test the whole dashboard is drawn with a single write."""
+        with patch("display.clear_screen"), patch("display.sys.stdout") as mock_stdout:
+            display_reading(sample_reading, "All good")
+
+        mock_stdout.write.assert_called_once()
+        assert "TEMPERATURE [OK]" in mock_stdout.write.call_args[0][0]
+
+
+class TestClearScreen:
+    """Tests for terminal clearing."""
+
+    def test_clear_screen_writes_ansi_sequence(self):
+        """Test clearing uses escape codes instead of spawning a shell."""
+        with patch("display.os.name", "posix"), patch("display.os.system") as mock_system, \
+                patch("display.sys.stdout") as mock_stdout:
+            clear_screen()
+
+        mock_system.assert_not_called()
+        mock_stdout.write.assert_called_once_with("\x1b[H\x1b[2J")
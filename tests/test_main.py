@@ -0,0 +1,121 @@
+"""Tests for the monitoring loop."""
+
+import asyncio
+import threading
+import time
+from argparse import Namespace
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+import main
+from sensors import MockSensors
+
+
+class StopMonitor(Exception):
+    """Raised by the fake sleep to end the monitoring loop."""
+
+
+def _run_monitor(advisor, api, ticks=3, sensors=None, on_last_tick=None):
+    """Run monitor for a few ticks with sleeps that take almost no time."""
+    args = Namespace(interval=1, ai_interval=3600, push_interval=2)
+    if sensors is None:
+        sensors = MockSensors(rng=np.random.default_rng(42))
+    real_sleep = asyncio.sleep
+    reads = []
+
+    async def fake_sleep(delay):
+        if delay == args.interval:
+            reads.append(delay)
+            if len(reads) == ticks:
+                if on_last_tick is not None:
+                    on_last_tick()
+                raise StopMonitor
+        # Give the flusher and recommendation threads time to finish
+        await real_sleep(0.01)
+
+    with patch("main.asyncio.sleep", fake_sleep), \
+            patch("main.display_reading") as mock_display, pytest.raises(StopMonitor):
+        asyncio.run(main.monitor(args, sensors, advisor, api))
+    return mock_display
+
+
+class TestMonitor:
+    """Tests for the asyncio monitoring loop."""
+
+    def test_readings_are_queued_and_flushed(self):
+        """Test every reading is queued and the flusher pushes the queue."""
+        api = MagicMock()
+        advisor = MagicMock()
+        advisor.get_recommendation.return_value = "Water it"
+
+        _run_monitor(advisor, api)
+
+        assert api.queue_reading.call_count == 3
+        api.flush_readings.assert_called()
+
+    def test_recommendation_is_updated(self):
+        """Test a new recommendation is pushed and shown on the next tick."""
+        api = MagicMock()
+        advisor = MagicMock()
+        advisor.get_recommendation.return_value = "Water it"
+
+        mock_display = _run_monitor(advisor, api)
+
+        advisor.get_recommendation.assert_called_once()
+        api.push_analysis.assert_called_once()
+        assert api.push_analysis.call_args[0][1] == "Water it"
+        assert mock_display.call_args_list[-1][0][1] == "Water it"
+
+    def test_failed_recommendation_is_logged(self, capsys):
+        """Test a failing update is reported and the previous advice kept."""
+        api = MagicMock()
+        advisor = MagicMock()
+        advisor.get_recommendation.side_effect = RuntimeError("boom")
+
+        mock_display = _run_monitor(advisor, api)
+
+        assert "Recommendation update failed: RuntimeError('boom')" in capsys.readouterr().out
+        assert mock_display.call_args_list[-1][0][1].startswith("Initializing")
+
+    def test_slow_recommendation_does_not_delay_reads(self):
+        """Test sensor reads keep their cadence while Claude is still answering."""
+        release = threading.Event()
+        api = MagicMock()
+        advisor = MagicMock()
+        # Blocks until the last tick, so every read happens while the call is in flight
+        advisor.get_recommendation.side_effect = lambda reading: release.wait(5) and "Water it"
+        sensors = MagicMock(wraps=MockSensors(rng=np.random.default_rng(42)))
+
+        start = time.monotonic()
+        mock_display = _run_monitor(
+            advisor, api, ticks=10, sensors=sensors, on_last_tick=release.set
+        )
+
+        assert time.monotonic() - start < 2
+        assert sensors.read.call_count == 10
+        advisor.get_recommendation.assert_called_once()
+        assert all(call[0][1].startswith("Initializing") for call in mock_display.call_args_list)
+
+
+class TestMain:
+    """Tests for startup and shutdown."""
+
+    def test_interrupt_flushes_and_closes(self):
+        """Test Ctrl+C pushes the queued readings before closing the client."""
+        def interrupt(coro):
+            coro.close()
+            raise KeyboardInterrupt
+
+        args = Namespace(
+            real=False, interval=10, ai_interval=60, push_interval=60, batch_push=False
+        )
+        with patch("main.parse_args", return_value=args), patch("main.AIAdvisor"), \
+                patch("main.APIClient") as mock_api_cls, \
+                patch("main.asyncio.run", side_effect=interrupt), pytest.raises(SystemExit):
+            main.main()
+
+        api = mock_api_cls.return_value
+        api.flush_readings.assert_called_once()
+        api.close.assert_called_once()
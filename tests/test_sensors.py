@@ -3,89 +3,123 @@
 import pytest
 from datetime import datetime
 
-import sys
-from pathlib import Path
+import numpy as np
 
-sys.path.insert(0, str(Path(__file__).parent.parent))
-
-from sensors import SensorReading, MockSensors, get_sensor_interface
+from sensors import SensorReading, MockSensors, ReadingsHistory, get_sensor_interface
 
 
 class TestSensorReading:
-    """Tests for SensorReading dataclass."""
-
-    def test_sensor_reading_creation(self):
-        """Test creating a SensorReading with valid values."""
-        reading = SensorReading(
-            timestamp=datetime.now(),
-            temperature_c=22.5,
-            humidity_percent=65.0,
-            co2_ppm=450.0,
-            light_lux=5000.0,
-        )
-        assert reading.temperature_c == 22.5
-        assert reading.humidity_percent == 65.0
-        assert reading.co2_ppm == 450.0
-        assert reading.light_lux == 5000.0
+    """Tests for SensorReading named tuple."""
 
-    def test_sensor_reading_has_timestamp(self):
-        """Test that sensor reading includes timestamp."""
+    def test_sensor_reading_roundtrip(self):
+        """Test a reading keeps its timestamp and values in field order."""
         now = datetime.now()
-        reading = SensorReading(
-            timestamp=now,
-            temperature_c=22.0,
-            humidity_percent=60.0,
-            co2_ppm=400.0,
-            light_lux=3000.0,
-        )
+        reading = SensorReading(now, 22.5, 65.0, 450.0, 5000.0)
+        assert tuple(reading) == (now, 22.5, 65.0, 450.0, 5000.0)
         assert reading.timestamp == now
+        assert reading.light_lux == 5000.0
 
 
 class TestMockSensors:
     """Tests for MockSensors class."""
 
-    def test_mock_sensors_returns_reading(self):
+    def test_mock_sensors_returns_reading(self, mock_sensors):
         """Test that MockSensors returns a SensorReading."""
-        sensors = MockSensors()
-        reading = sensors.read()
+        reading = mock_sensors.read()
         assert isinstance(reading, SensorReading)
 
-    def test_mock_sensors_realistic_temperature(self):
+    def test_mock_sensors_realistic_temperature(self, mock_sensors):
         """Test that mock temperature is in realistic range."""
-        sensors = MockSensors()
-        reading = sensors.read()
+        reading = mock_sensors.read()
         # Base temp is 22 +/- 2
         assert 15 <= reading.temperature_c <= 30
 
-    def test_mock_sensors_humidity_bounded(self):
-        """Test that mock humidity is bounded 0-100."""
-        sensors = MockSensors()
-        for _ in range(100):  # Multiple reads to test bounds
-            reading = sensors.read()
-            assert 0 <= reading.humidity_percent <= 100
-
-    def test_mock_sensors_co2_non_negative(self):
-        """Test that CO2 is never below realistic minimum."""
-        sensors = MockSensors()
-        for _ in range(100):
-            reading = sensors.read()
-            assert reading.co2_ppm >= 300
-
-    def test_mock_sensors_light_non_negative(self):
-        """Test that light level is never negative."""
-        sensors = MockSensors()
-        for _ in range(100):
-            reading = sensors.read()
-            assert reading.light_lux >= 0
+    @pytest.mark.parametrize(
+        "field,low,high",
+        [
+            ("humidity_percent", 0, 100),
+            ("co2_ppm", 300, float("inf")),
+            ("light_lux", 0, float("inf")),
+        ],
+    )
+    def test_mock_sensors_values_bounded(self, readings_sample, field, low, high):
+        """Test that humidity, CO2 and light stay within physical bounds."""
+        values = np.fromiter(
+            (getattr(r, field) for r in readings_sample),
+            dtype=np.float64,
+            count=len(readings_sample),
+        )
+        assert (values >= low).all() and (values <= high).all()
+
+    def test_mock_sensors_values_are_python_floats(self, mock_sensors):
+        """Test that readings hold plain floats, not NumPy scalars."""
+        reading = mock_sensors.read()
+        assert all(type(value) is float for value in reading[1:])
+
+    def test_mock_sensors_uses_given_timestamp(self, mock_sensors):
+        """Test that a caller-supplied timestamp is used for the reading."""
+        now = datetime(2026, 1, 15, 12, 0, 0)
+        reading = mock_sensors.read(now)
+        assert reading.timestamp == now
 
     def test_mock_sensors_multiple_reads_vary(self):
         """Test that multiple readings have some variation."""
-        sensors = MockSensors()
-        readings = [sensors.read() for _ in range(10)]
+        # A fresh seeded generator, so the result does not depend on test order
+        sensors = MockSensors(rng=np.random.default_rng(42))
+        readings = [sensors.read() for _ in range(2)]
         temps = [r.temperature_c for r in readings]
-        # Should have at least some variation
         assert max(temps) != min(temps)
 
+    def test_mock_sensors_seeded_reads_repeat(self):
+        """Test that sensors seeded alike produce the same readings."""
+        now = datetime(2026, 1, 15, 12, 0, 0)
+        first = MockSensors(rng=np.random.default_rng(7)).read(now)
+        second = MockSensors(rng=np.random.default_rng(7)).read(now)
+        assert first == second
+
+
+class TestReadingsHistory:
+    """Tests for the readings ring buffer."""
+
+    @staticmethod
+    def _reading(value: float) -> SensorReading:
+        return SensorReading(datetime.now(), value, value, value, value)
+
+    def test_empty_history(self):
+        """Test an empty history has no readings and a NaN mean."""
+        history = ReadingsHistory(size=4)
+        assert len(history) == 0
+        assert np.isnan(history.rolling_mean()).all()
+
+    def test_append_and_latest(self):
+        """Test readings come back oldest first."""
+        history = ReadingsHistory(size=4)
+        for value in (1.0, 2.0, 3.0):
+            history.append(self._reading(value))
+        assert len(history) == 3
+        assert history.latest(2)[:, 0].tolist() == [2.0, 3.0]
+
+    def test_wraps_around_when_full(self):
+        """Test the oldest readings are overwritten once full."""
+        history = ReadingsHistory(size=4)
+        for value in range(1, 7):
+            history.append(self._reading(float(value)))
+        assert len(history) == 4
+        assert history.latest(10)[:, 0].tolist() == [3.0, 4.0, 5.0, 6.0]
+
+    def test_rolling_mean(self):
+        """Test the rolling mean covers only the last k readings."""
+        history = ReadingsHistory(size=4)
+        for value in range(1, 7):
+            history.append(self._reading(float(value)))
+        assert history.rolling_mean(k=2).tolist() == [5.5, 5.5, 5.5, 5.5]
+
+    def test_stored_as_float32(self):
+        """Test values are kept in a compact float32 buffer."""
+        history = ReadingsHistory(size=4)
+        history.append(self._reading(1.0))
+        assert history.latest(1).dtype == np.float32
+
 
 class TestGetSensorInterface:
     """Tests for sensor interface factory function."""